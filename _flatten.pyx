@@ -0,0 +1,66 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+Aplanado de registros anidados en C
+
+Versión compilada de ingesta._flatten: misma semántica (claves a.b.c, en el
+mismo orden), pero recorre los diccionarios con PyDict_Next sin pasar por el
+intérprete. Compilar con: cythonize -i _flatten.pyx
+"""
+import sys
+
+from cpython.dict cimport PyDict_Next, PyDict_SetItem
+from cpython.ref cimport PyObject
+
+# Claves aplanadas ya construidas: prefijo -> clave -> "a.b.c" internada.
+# Mismos límites que ingesta._FLAT_KEYS.
+cdef dict _FLAT_KEYS = {}
+cdef Py_ssize_t _FLAT_KEYS_MAX_PREFIXES = 256
+cdef Py_ssize_t _FLAT_KEYS_MAX_PER_PREFIX = 1024
+
+
+cdef int _flatten_into(dict d, dict out, str prefix) except -1:
+    cdef Py_ssize_t pos = 0
+    cdef PyObject *key
+    cdef PyObject *value
+    cdef dict keys = _FLAT_KEYS.get(prefix)
+
+    # Con la caché llena los prefijos nuevos no se guardan (keys queda en None)
+    if keys is None and len(_FLAT_KEYS) < _FLAT_KEYS_MAX_PREFIXES:
+        keys = {}
+        _FLAT_KEYS[prefix] = keys
+
+    while PyDict_Next(d, &pos, &key, &value):
+        flat_key = keys.get(<object>key) if keys is not None else None
+        if flat_key is None:
+            flat_key = prefix + "." + <str>key if prefix else <str>key
+            if keys is not None and len(keys) < _FLAT_KEYS_MAX_PER_PREFIX:
+                flat_key = sys.intern(flat_key)
+                keys[<object>key] = flat_key
+
+        if isinstance(<object>value, dict):
+            _flatten_into(<dict>value, out, flat_key)
+        else:
+            PyDict_SetItem(out, flat_key, <object>value)
+
+    return 0
+
+
+def flatten_records(list items):
+    """
+    Aplana una lista de registros anidados
+
+    Args:
+        items: Lista de registros
+
+    Returns:
+        Lista de diccionarios aplanados
+    """
+    cdef list result = []
+    cdef dict out
+
+    for item in items:
+        out = {}
+        _flatten_into(<dict?>item, out, "")
+        result.append(out)
+
+    return result
@@ -1,33 +1,597 @@
 import boto3
-import pandas as pd
+from botocore.config import Config
+from boto3.s3.transfer import TransferConfig
+import pyarrow as pa
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
 import json
+import base64
+import io
+import tempfile
+import orjson
+import queue
+import threading
+from itertools import chain, islice, repeat
+from contextlib import closing
 from datetime import datetime
 import os
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Tuple, BinaryIO, Callable, Set
 import logging
 import sys
-from logging.handlers import RotatingFileHandler
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+import atexit
 import time
+from concurrent.futures import ThreadPoolExecutor, Future
+
+try:
+    # API de s3transfer 0.6 (la que fija boto3 1.26)
+    from s3transfer.crt import (
+        BotocoreCRTRequestSerializer,
+        CRTTransferManager,
+        create_s3_crt_client,
+    )
+    HAS_CRT = True
+except ImportError:
+    HAS_CRT = False
+
+# Registros por RecordBatch al releer las páginas guardadas
+SPOOL_BATCH_ROWS = 10000
+
+# Registros máximos que se miran para fijar los tipos de una tabla con proyección
+TYPE_SAMPLE_ROWS = 10000
+
+# Tamaño objetivo (en memoria) de cada row group Parquet
+PARQUET_ROW_GROUP_BYTES = 64 * 1024 * 1024
+
+# Extensión de archivo por codec de compresión del CSV
+CSV_COMPRESSION_EXTENSIONS = {'zstd': 'zst', 'gzip': 'gz'}
+
+
+# Claves aplanadas ya construidas: prefijo -> clave -> "a.b.c" internada.
+# Acotadas para que atributos con claves arbitrarias (p. ej. mapas indexados
+# por id) no hagan crecer la caché ni internen cada clave indefinidamente.
+_FLAT_KEYS: Dict[str, Dict[str, str]] = {}
+_FLAT_KEYS_MAX_PREFIXES = 256
+_FLAT_KEYS_MAX_PER_PREFIX = 1024
+
+
+def _flat_keys_for(prefix: str) -> Optional[Dict[str, str]]:
+    """
+    Caché de claves aplanadas de un prefijo
+
+    Args:
+        prefix: Prefijo aplanado ("" para el nivel raíz)
+
+    Returns:
+        Diccionario clave -> clave aplanada, o None si el prefijo no está y la caché está llena
+    """
+    keys = _FLAT_KEYS.get(prefix)
+    if keys is None and len(_FLAT_KEYS) < _FLAT_KEYS_MAX_PREFIXES:
+        keys = _FLAT_KEYS[prefix] = {}
+    return keys
+
+
+def _flatten(d: Dict[str, Any], out: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Aplana un diccionario anidado usando claves separadas por punto (a.b.c)
+
+    Recorre el diccionario con una pila en vez de recursión y reutiliza las
+    claves aplanadas (internadas) de la caché acotada _FLAT_KEYS. Las claves
+    que no caben en la caché se construyen en cada registro sin internarlas.
+
+    Args:
+        d: Diccionario a aplanar
+        out: Diccionario destino donde se escriben las claves aplanadas
+
+    Returns:
+        El diccionario destino
+    """
+    stack = [(iter(d.items()), "", _flat_keys_for(""))]
+
+    while stack:
+        items, prefix, keys = stack[-1]
+        for k, v in items:
+            flat_key = keys.get(k) if keys is not None else None
+            if flat_key is None:
+                flat_key = f"{prefix}.{k}" if prefix else k
+                if keys is not None and len(keys) < _FLAT_KEYS_MAX_PER_PREFIX:
+                    flat_key = keys[k] = sys.intern(flat_key)
+
+            if isinstance(v, dict):
+                stack.append((iter(v.items()), flat_key, _flat_keys_for(flat_key)))
+                break
+            out[flat_key] = v
+        else:
+            stack.pop()
+
+    return out
+
+
+def _flatten_records(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Aplana una lista de registros anidados (versión en Python de _flatten.pyx)
+
+    Args:
+        items: Lista de registros
+
+    Returns:
+        Lista de diccionarios aplanados
+    """
+    return [_flatten(item, {}) for item in items]
+
+
+try:
+    from _flatten import flatten_records
+except ImportError:
+    flatten_records = _flatten_records
+
+
+def _parse_number(value: str) -> Any:
+    """
+    Convierte un número de DynamoDB (string) a int, o a float si no es entero o no cabe en 64 bits
+
+    El tipo final de la columna se decide en _column_type: si una columna
+    mezcla int y float, toda la columna se exporta como float64 y sus enteros
+    se convierten a float al construir el batch.
+
+    Args:
+        value: Número en formato string
+
+    Returns:
+        int o float
+    """
+    try:
+        number = int(value)
+    except ValueError:
+        return float(value)
+    return number if -2**63 <= number < 2**63 else float(number)
+
+
+def _from_attribute_value(value: Dict[str, Any]) -> Any:
+    """
+    Convierte un AttributeValue crudo de DynamoDB ({'S': 'x'}, {'N': '1'}, ...) a tipos nativos
+
+    Args:
+        value: AttributeValue de DynamoDB
+
+    Returns:
+        Valor nativo (str, int, float, bool, None, dict o list)
+    """
+    (value_type, raw), = value.items()
+
+    if value_type == 'S':
+        return raw
+    if value_type == 'N':
+        return _parse_number(raw)
+    if value_type == 'M':
+        return {k: _from_attribute_value(v) for k, v in raw.items()}
+    if value_type == 'L':
+        return [_from_attribute_value(v) for v in raw]
+    if value_type == 'BOOL':
+        return raw
+    if value_type == 'NULL':
+        return None
+    if value_type == 'SS':
+        return list(raw)
+    if value_type == 'NS':
+        return [_parse_number(v) for v in raw]
+    if value_type == 'B':
+        return base64.b64encode(raw).decode()
+    if value_type == 'BS':
+        return [base64.b64encode(v).decode() for v in raw]
+    raise ValueError(f"Tipo de DynamoDB no soportado: {value_type}")
+
+
+# Tipo Arrow de las columnas cuyos valores son todos del mismo tipo Python
+_ARROW_TYPES = {bool: pa.bool_(), int: pa.int64(), float: pa.float64(), str: pa.string()}
+
+
+def _resolve_arrow_type(value_types: Set[type]) -> Optional[pa.DataType]:
+    """
+    Tipo Arrow primitivo común a un conjunto de tipos Python
+
+    Args:
+        value_types: Tipos Python de los valores (None incluido)
+
+    Returns:
+        Tipo Arrow, o None si los valores no comparten un tipo primitivo
+    """
+    value_types = value_types - {type(None)}
+    if not value_types:
+        return pa.string()
+    if value_types == {int, float}:
+        return pa.float64()
+    if len(value_types) == 1:
+        return _ARROW_TYPES.get(next(iter(value_types)))
+    return None
+
+
+def _column_type(value_types: Set[type], element_types: Set[type]) -> pa.DataType:
+    """
+    Tipo Arrow estable de una columna a partir de todos sus valores
+
+    Las listas cuyos elementos comparten un tipo primitivo se mantienen como
+    listas; cualquier otra mezcla de tipos cae a string (valores en JSON).
+
+    Args:
+        value_types: Tipos Python de los valores de la columna
+        element_types: Tipos Python de los elementos de las listas de la columna
+
+    Returns:
+        Tipo Arrow de la columna
+    """
+    arrow_type = _resolve_arrow_type(value_types)
+    if arrow_type is not None:
+        return arrow_type
+    if value_types - {type(None)} == {list}:
+        element_type = _resolve_arrow_type(element_types)
+        if element_type is not None:
+            return pa.list_(element_type)
+    return pa.string()
+
+
+def _collect_types(rows: List[Dict[str, Any]], names: Iterable[str],
+                   value_types: Dict[str, Set[type]], element_types: Dict[str, Set[type]]) -> None:
+    """
+    Registra los tipos Python de los valores (y de los elementos de listas) de cada columna
+
+    Args:
+        rows: Registros
+        names: Columnas a revisar
+        value_types: Tipos de los valores por columna (se actualiza)
+        element_types: Tipos de los elementos de listas por columna (se actualiza)
+    """
+    for name in names:
+        values = list(map(dict.get, rows, repeat(name)))
+        types = value_types.setdefault(name, set())
+        types.update(map(type, values))
+        if list in types:
+            elements = element_types.setdefault(name, set())
+            for value in values:
+                if type(value) is list:
+                    elements.update(map(type, value))
+
+
+def _table_schema(fieldnames: List[str], value_types: Dict[str, Set[type]],
+                  element_types: Dict[str, Set[type]]) -> pa.Schema:
+    """
+    Esquema Arrow de la tabla a partir de los tipos registrados por columna
+
+    Args:
+        fieldnames: Columnas en orden
+        value_types: Tipos de los valores por columna
+        element_types: Tipos de los elementos de listas por columna
+
+    Returns:
+        Esquema Arrow
+    """
+    return pa.schema([
+        (name, _column_type(value_types.get(name, set()), element_types.get(name, set())))
+        for name in fieldnames
+    ])
+
+
+# Tipo Python que Arrow acepta sin conversión para cada tipo primitivo
+_PYTHON_TYPES = {arrow_type: python_type for python_type, arrow_type in _ARROW_TYPES.items()}
+
+# Marca de un valor que no se puede convertir al tipo de su columna
+_REJECTED = object()
+
+
+def _conform_value(value: Any, arrow_type: pa.DataType) -> Any:
+    """
+    Convierte un valor (no nulo) al tipo Arrow de su columna
+
+    Args:
+        value: Valor del registro
+        arrow_type: Tipo Arrow de la columna
+
+    Returns:
+        Valor convertido, o _REJECTED si no es convertible
+    """
+    value_type = type(value)
+    if arrow_type == pa.string():
+        return value if value_type is str else orjson.dumps(value).decode()
+    if arrow_type == pa.float64():
+        return float(value) if value_type is int or value_type is float else _REJECTED
+    if arrow_type == pa.int64():
+        if value_type is int:
+            return value
+        if value_type is float and value.is_integer() and -2**63 <= value < 2**63:
+            return int(value)
+        return _REJECTED
+    if pa.types.is_list(arrow_type):
+        if value_type is not list:
+            return _REJECTED
+        elements = [None if v is None else _conform_value(v, arrow_type.value_type) for v in value]
+        return _REJECTED if any(e is _REJECTED for e in elements) else elements
+    return value if value_type is _PYTHON_TYPES.get(arrow_type) else _REJECTED
+
+
+def _conform_values(values: List[Any], arrow_type: pa.DataType) -> Tuple[List[Any], int]:
+    """
+    Adapta los valores de una columna a su tipo Arrow
+
+    Los enteros de columnas float64 pasan a float (Arrow rechaza los int > 2**53),
+    los valores no string de columnas string se serializan a JSON y los que no
+    se pueden convertir (p. ej. un string en una columna int64) quedan en None.
+
+    Args:
+        values: Valores de la columna
+        arrow_type: Tipo Arrow de la columna
+
+    Returns:
+        Tupla (valores adaptados, número de valores descartados)
+    """
+    python_type = _PYTHON_TYPES.get(arrow_type)
+    if python_type is not None and set(map(type, values)) <= {python_type, type(None)}:
+        return values, 0
+
+    conformed = [None if v is None else _conform_value(v, arrow_type) for v in values]
+    rejected = sum(1 for v in conformed if v is _REJECTED)
+    if rejected:
+        conformed = [None if v is _REJECTED else v for v in conformed]
+    return conformed, rejected
+
+
+def _column_order(columns: Iterable[str], projection: Optional[List[str]] = None) -> List[str]:
+    """
+    Orden estable de las columnas exportadas
+
+    Con proyección las columnas son los atributos proyectados, en su orden
+    (aparezcan o no en los registros). Sin proyección, las columnas encontradas
+    en orden alfabético.
+
+    Args:
+        columns: Columnas encontradas en los registros aplanados
+        projection: Atributos de primer nivel configurados para la tabla
+
+    Returns:
+        Lista ordenada de columnas
+    """
+    if projection:
+        return list(dict.fromkeys(projection))
+    return sorted(columns)
+
+
+def _nested_to_json(batch: pa.RecordBatch) -> pa.RecordBatch:
+    """
+    Serializa a JSON las columnas anidadas (listas, structs), que el writer CSV no soporta
+
+    Args:
+        batch: RecordBatch Arrow
+
+    Returns:
+        RecordBatch con las columnas anidadas como string
+    """
+    if not any(pa.types.is_nested(field.type) for field in batch.schema):
+        return batch
+
+    columns = []
+    for column, field in zip(batch.columns, batch.schema):
+        if pa.types.is_nested(field.type):
+            column = pa.array([None if v is None else orjson.dumps(v).decode() for v in column.to_pylist()], pa.string())
+        columns.append(column)
+    return pa.RecordBatch.from_arrays(columns, names=batch.schema.names)
+
+
+class S3MultipartWriter(io.RawIOBase):
+    """
+    Archivo de solo escritura que sube su contenido a S3 por multipart upload
+
+    Los bytes se acumulan en un buffer y cada parte completa se sube en
+    paralelo mientras se sigue escribiendo. Usado como context manager,
+    la carga se completa al salir o se aborta si hubo una excepción.
+    """
+
+    def __init__(self, s3, bucket_name: str, s3_key: str, part_size: int = 128 * 1024 * 1024, max_workers: int = 4):
+        """
+        Inicia el multipart upload
+
+        Args:
+            s3: Cliente S3
+            bucket_name: Bucket destino
+            s3_key: Key destino en S3
+            part_size: Tamaño de cada parte (mínimo 5 MiB)
+            max_workers: Número máximo de partes subiéndose en paralelo; la memoria
+                usada es de hasta (max_workers + 1) * part_size
+        """
+        super().__init__()
+        self.s3 = s3
+        self.bucket_name = bucket_name
+        self.s3_key = s3_key
+        self.part_size = part_size
+        self._buffer = io.BytesIO()
+        self._position = 0
+        self._parts = []
+        # Limita las partes en memoria a las que se están subiendo
+        self._slots = threading.Semaphore(max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._upload_id = self.s3.create_multipart_upload(Bucket=bucket_name, Key=s3_key)['UploadId']
+
+    def writable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def write(self, b) -> int:
+        written = self._buffer.write(b)
+        self._position += written
+        if self._buffer.tell() >= self.part_size:
+            self._flush_part()
+        return written
+
+    def _raise_failed_part(self):
+        """
+        Relanza el error de la primera parte cuya subida ya falló
+        """
+        for future in self._parts:
+            if future.done() and future.exception() is not None:
+                raise future.exception()
+
+    def _flush_part(self):
+        """
+        Envía el contenido del buffer como la siguiente parte
+
+        Si alguna parte anterior falló se lanza su excepción en lugar de
+        seguir escribiendo, para que la exportación falle cuanto antes.
+        """
+        self._raise_failed_part()
+        body = self._buffer.getvalue()
+        self._buffer = io.BytesIO()
+        self._slots.acquire()
+        self._raise_failed_part()
+        part_number = len(self._parts) + 1
+        self._parts.append(self._executor.submit(self._upload_part, part_number, body))
+
+    def _upload_part(self, part_number: int, body: bytes) -> Dict[str, Any]:
+        """
+        Sube una parte del multipart upload
+
+        Args:
+            part_number: Número de la parte (desde 1)
+            body: Contenido de la parte
+
+        Returns:
+            Parte en el formato de CompleteMultipartUpload
+        """
+        try:
+            response = self.s3.upload_part(
+                Bucket=self.bucket_name,
+                Key=self.s3_key,
+                UploadId=self._upload_id,
+                PartNumber=part_number,
+                Body=body
+            )
+            return {'PartNumber': part_number, 'ETag': response['ETag']}
+        finally:
+            self._slots.release()
+
+    def close(self):
+        """
+        Sube la última parte y completa el multipart upload
+        """
+        if self.closed:
+            return
+        try:
+            if self._buffer.tell() or not self._parts:
+                self._flush_part()
+            parts = [future.result() for future in self._parts]
+            self.s3.complete_multipart_upload(
+                Bucket=self.bucket_name,
+                Key=self.s3_key,
+                UploadId=self._upload_id,
+                MultipartUpload={'Parts': parts}
+            )
+        except Exception:
+            self.abort()
+            raise
+        finally:
+            self._executor.shutdown(wait=True)
+            super().close()
+
+    def abort(self):
+        """
+        Aborta el multipart upload descartando las partes subidas
+        """
+        if self.closed:
+            return
+        try:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self.s3.abort_multipart_upload(Bucket=self.bucket_name, Key=self.s3_key, UploadId=self._upload_id)
+        finally:
+            super().close()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
+
+
+def default_s3_prefix(table_name: str) -> str:
+    """
+    Carpeta destino en S3 para una tabla: el nombre sin el prefijo de entorno
+
+    Args:
+        table_name: Nombre de la tabla (p. ej. 'dev-fp-t_user_replays')
+
+    Returns:
+        Carpeta destino ('users', 'user_replays', etc.)
+    """
+    return table_name.split('_', 1)[-1]
+
 
 class DynamoDBExporter:
-    def __init__(self, table_names: List[str], container_name: str):
+    def __init__(self, table_names: List[str], container_name: str, total_segments: int = 8,
+                 file_format: str = 'parquet', stream_to_s3: bool = True,
+                 csv_compression: Optional[str] = 'zstd', output_dir: Optional[str] = None,
+                 bucket_name: str = "earr99-spotify-data-prod", logger: Optional[logging.Logger] = None,
+                 s3_prefix_fn: Callable[[str], str] = default_s3_prefix,
+                 projections: Optional[Dict[str, List[str]]] = None):
         """        
         Inicializa el exportador de datos de DynamoDB
 
         Args:
             table_names: Lista de tablas a importar en DynamoDB
             container_name: Nombre del contenedor para los logs
+            total_segments: Número de segmentos para el escaneo paralelo
+            file_format: Formato de exportación ('parquet' o 'csv')
+            stream_to_s3: Subir directamente a S3 sin escribir el archivo en disco
+            csv_compression: Codec de compresión del CSV ('zstd', 'gzip' o None)
+            output_dir: Directorio local de exportación (por defecto ./data junto al script)
+            bucket_name: Bucket S3 destino
+            logger: Logger a usar; si es None se configura el logging del contenedor
+            s3_prefix_fn: Función que devuelve la carpeta S3 de cada tabla
+            projections: Atributos a exportar por tabla; las tablas sin entrada se exportan completas
         """
-        self.dynamodb = boto3.resource('dynamodb', 'us-east-1')
+        if file_format not in ('parquet', 'csv'):
+            raise ValueError(f"Formato de exportación no soportado: {file_format}")
+        if csv_compression is not None and csv_compression not in CSV_COMPRESSION_EXTENSIONS:
+            raise ValueError(f"Compresión de CSV no soportada: {csv_compression}")
+        self.file_format = file_format
+        self.csv_compression = csv_compression
+        if file_format == 'csv' and csv_compression is not None:
+            self.file_extension = f"csv.{CSV_COMPRESSION_EXTENSIONS[csv_compression]}"
+        else:
+            self.file_extension = file_format
+        self.stream_to_s3 = stream_to_s3
+        self.total_segments = total_segments
+        self.session = boto3.session.Session(region_name='us-east-1')
+        # Una sola sesión y configuración para DynamoDB y S3; el pool de conexiones
+        # debe alcanzar para los hilos de escaneo y de carga multipart
+        self.client_config = Config(
+            max_pool_connections=max(64, total_segments * 2),
+            retries={'mode': 'adaptive', 'max_attempts': 10},
+            tcp_keepalive=True
+        )
+        self.dynamodb = self.session.client('dynamodb', config=self.client_config)
         self.table_names = table_names
-        self.s3 = boto3.client('s3', 'us-east-1')
-        self.bucket_name = "earr99-spotify-data-prod"
+        self.s3 = self.session.client('s3', config=self.client_config)
+        # Partes de 128 MiB subidas en paralelo para archivos grandes
+        self.transfer_config = TransferConfig(
+            multipart_threshold=128 * 1024 * 1024,
+            multipart_chunksize=128 * 1024 * 1024,
+            max_concurrency=16,
+            use_threads=True,
+            io_chunksize=1024 * 1024
+        )
+        # Se crean en cada run() y se liberan al terminar
+        self.transfer = None
+        self.upload_executor = None
+        self.bucket_name = bucket_name
+        self.s3_prefix_fn = s3_prefix_fn
+        self.projections = projections or {}
         self.container_name = container_name
 
         
-        self.output_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+        self.output_dir = output_dir or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
 
-        self.setup_logging()
+        if logger is None:
+            self.setup_logging()
+        else:
+            self.logger = logger
 
 
     def setup_logging(self):
@@ -58,63 +622,150 @@ class DynamoDBExporter:
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setFormatter(formatter)
         
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(console_handler)
+        # Los hilos solo encolan registros; un listener en segundo plano formatea y escribe
+        log_queue = queue.Queue(-1)
+        self.logger.addHandler(QueueHandler(log_queue))
+        self.log_listener = QueueListener(log_queue, file_handler, console_handler)
+        self.log_listener.start()
+        atexit.register(self.log_listener.stop)
+
 
+    def _put_page(self, pages: queue.Queue, page: Optional[List[Dict[str, Any]]], stop: threading.Event):
+        """
+        Encola una página sin bloquear indefinidamente si el consumidor se detuvo
 
-    def scan_table(self, table_name: str) -> List[Dict[str, Any]]:
+        Args:
+            pages: Cola compartida de páginas
+            page: Página de registros (None marca el fin de un segmento)
+            stop: Evento que indica que el consumidor dejó de leer
         """
-        Scan tabla DynamoDB 
+        while not stop.is_set():
+            try:
+                pages.put(page, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def _scan_segment(self, paginator, table_name: str, segment: int, total_segments: int,
+                      pages: queue.Queue, stop: threading.Event, scan_kwargs: Dict[str, Any]):
+        """
+        Scan de un segmento de la tabla DynamoDB, encolando cada página
+
+        Args:
+            paginator: Paginator 'scan' del cliente DynamoDB
+            table_name: Tabla a scanear
+            segment: Índice del segmento a escanear
+            total_segments: Número total de segmentos
+            pages: Cola compartida de páginas
+            stop: Evento que indica que el consumidor dejó de leer
+            scan_kwargs: Parámetros adicionales del scan (proyección)
+        """
+        try:
+            for response in paginator.paginate(
+                TableName=table_name,
+                Segment=segment,
+                TotalSegments=total_segments,
+                PaginationConfig={'PageSize': 1000},
+                **scan_kwargs
+            ):
+                if stop.is_set():
+                    return
+                page = [
+                    {k: _from_attribute_value(v) for k, v in item.items()}
+                    for item in response['Items']
+                ]
+                self._put_page(pages, page, stop)
+        finally:
+            self._put_page(pages, None, stop)
+
+
+    def scan_table(self, table_name: str, total_segments: Optional[int] = None,
+                   projection: Optional[List[str]] = None) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Scan tabla DynamoDB en paralelo por segmentos
         
         Args:
             table_name: Tabla a scanear
+            total_segments: Número de segmentos (por defecto self.total_segments)
+            projection: Atributos de primer nivel a leer; None lee todos
             
-        Returns:
-            Lista de registros de la tabla
+        Yields:
+            Páginas de registros de la tabla, a medida que llegan
         """
-        table = self.dynamodb.Table(table_name)
-        items = []
+        paginator = self.dynamodb.get_paginator('scan')
+        scan_kwargs = {}
+        if projection:
+            # Alias para que los nombres no choquen con palabras reservadas de DynamoDB
+            attribute_names = {f"#a{i}": name for i, name in enumerate(projection)}
+            scan_kwargs = {
+                'ProjectionExpression': ', '.join(attribute_names),
+                'ExpressionAttributeNames': attribute_names
+            }
+        total_segments = total_segments or self.total_segments
+        pages = queue.Queue(maxsize=total_segments * 2)
+        stop = threading.Event()
+        total_items = 0
+
+        self.logger.info(f"Iniciando escaneo de tabla {table_name} con {total_segments} segmentos")
+        start_time = time.time()
+        executor = ThreadPoolExecutor(max_workers=total_segments)
         
         try:
-            self.logger.info(f"Iniciando escaneo de tabla {table_name}")
-            start_time = time.time()
+            futures = [
+                executor.submit(self._scan_segment, paginator, table_name, segment, total_segments, pages, stop, scan_kwargs)
+                for segment in range(total_segments)
+            ]
 
-            response = table.scan()
-            items.extend(response['Items'])
-            
-            while 'LastEvaluatedKey' in response:
-                response = table.scan(
-                    ExclusiveStartKey=response['LastEvaluatedKey']
-                )
-                items.extend(response['Items'])
+            pending_segments = total_segments
+            while pending_segments:
+                page = pages.get()
+                if page is None:
+                    pending_segments -= 1
+                    continue
+                total_items += len(page)
+                yield page
+
+            for future in futures:
+                future.result()
                 
             duration = time.time() - start_time
-            self.logger.info(f"Escaneo completo. Total registros: {len(items)}. Duración: {duration:.2f} segundos")
-            return items
+            self.logger.info(f"Escaneo completo. Total registros: {total_items}. Duración: {duration:.2f} segundos")
             
         except Exception as e:
             self.logger.error(f"Error escaneando {table_name}: {str(e)}")
-            return []
+            raise
+
+        finally:
+            stop.set()
+            executor.shutdown(wait=True)
 
 
-    def normalize_data(self, items: List[Dict[str, Any]]) -> pd.DataFrame:
+    def _create_crt_transfer_manager(self) -> Optional["CRTTransferManager"]:
         """
-        Normalizar registros DynamoDB a pandas DataFrame
-        
-        Args:
-            items: Lista de registros de DynamoDB
-            
+        Crea el transfer manager de AWS CRT para las cargas a S3
+
         Returns:
-            Pandas DataFrame normalizado
+            CRTTransferManager, o None si awscrt no está instalado o no hay credenciales
         """
-        self.logger.info(f"Iniciando normalización de {len(items)} registros")
-        try:
-            df = pd.json_normalize(items)
-            self.logger.info(f"Normalización completada. Columnas resultantes: {', '.join(df.columns)}")
-            return df
-        except Exception as e:
-            self.logger.error(f"Error en normalización: {str(e)}")
-            raise
+        if not HAS_CRT:
+            self.logger.warning("awscrt no disponible, las cargas a S3 usarán upload_file")
+            return None
+        if self.session.get_credentials() is None:
+            self.logger.warning("Sin credenciales para AWS CRT, las cargas a S3 usarán upload_file")
+            return None
+
+        botocore_session = self.session._session
+        crt_client = create_s3_crt_client(
+            region=self.session.region_name,
+            botocore_credential_provider=botocore_session.get_component('credential_provider'),
+            target_throughput=10 * 1024**3 / 8,  # 10 Gbps en bytes
+            part_size=self.transfer_config.multipart_chunksize
+        )
+        serializer = BotocoreCRTRequestSerializer(
+            botocore_session,
+            client_kwargs={'region_name': self.session.region_name}
+        )
+        return CRTTransferManager(crt_client, serializer)
 
     def upload_to_s3(self, file_path: str, filename: str, folder: str):
         """
@@ -128,31 +779,277 @@ class DynamoDBExporter:
         try:
             self.logger.info(f"Iniciando carga a S3 del archivo {filename}")
             s3_key = f"{folder}/{filename}"
-            self.s3.upload_file(file_path, self.bucket_name, s3_key)
+            if self.transfer is not None:
+                self.transfer.upload(file_path, self.bucket_name, s3_key).result()
+            else:
+                self.s3.upload_file(file_path, self.bucket_name, s3_key, Config=self.transfer_config)
             self.logger.info(f"Archivo cargado exitosamente a s3://{self.bucket_name}/{s3_key}")
         except Exception as e:
             self.logger.error(f"Error cargando archivo a S3: {str(e)}")
             raise
 
-    def export_data(self, df: pd.DataFrame, table_name: str, folder: str):
+    def _rows_to_batch(self, rows: List[Dict[str, Any]], schema: pa.Schema) -> pa.RecordBatch:
+        """
+        Construye un RecordBatch desde columnas (dict de listas) con el esquema de la tabla
+
+        Args:
+            rows: Registros
+            schema: Esquema Arrow de la tabla
+
+        Returns:
+            RecordBatch Arrow
+        """
+        columns = {}
+        for field in schema:
+            values, rejected = _conform_values(list(map(dict.get, rows, repeat(field.name))), field.type)
+            if rejected:
+                self.logger.warning(f"{rejected} valores de la columna {field.name} no son {field.type}; se exportan vacíos")
+            columns[field.name] = values
+        return pa.RecordBatch.from_pydict(columns, schema=schema)
+
+    def _projected_batches(self, pages: Iterable[List[Dict[str, Any]]],
+                           projection: List[str]) -> Iterator[pa.RecordBatch]:
+        """
+        RecordBatches de una tabla con proyección, página a página y sin archivo temporal
+
+        Las columnas son los atributos proyectados, en su orden, tomados del
+        registro sin aplanar (un map se exporta como JSON). Los tipos se fijan
+        con las primeras páginas, hasta que cada columna tenga algún valor o se
+        lleguen a TYPE_SAMPLE_ROWS registros; después cada página se convierte
+        en cuanto llega, así la escritura y la carga a S3 avanzan con el scan.
+
+        Args:
+            pages: Páginas de registros de DynamoDB
+            projection: Atributos proyectados
+
+        Yields:
+            Un RecordBatch por página
+        """
+        fieldnames = _column_order((), projection)
+        value_types = {}
+        element_types = {}
+        sample = []
+        sampled_rows = 0
+        schema = None
+
+        for page in pages:
+            if schema is None:
+                sample.append(page)
+                sampled_rows += len(page)
+                _collect_types(page, fieldnames, value_types, element_types)
+                typed = all(value_types[name] - {type(None)} for name in fieldnames)
+                if not typed and sampled_rows < TYPE_SAMPLE_ROWS:
+                    continue
+                schema = _table_schema(fieldnames, value_types, element_types)
+                pending, sample = sample, []
+            else:
+                pending = [page]
+
+            for rows in pending:
+                yield self._rows_to_batch(rows, schema)
+
+        if sample:
+            schema = _table_schema(fieldnames, value_types, element_types)
+            for rows in sample:
+                yield self._rows_to_batch(rows, schema)
+
+    def _spool_pages(self, pages: Iterable[List[Dict[str, Any]]],
+                     spool: BinaryIO) -> Tuple[Dict[str, Set[type]], Dict[str, Set[type]]]:
+        """
+        Aplana las páginas de registros y las guarda como líneas JSON en un archivo temporal
+
+        Args:
+            pages: Páginas de registros de DynamoDB
+            spool: Archivo temporal binario
+
+        Returns:
+            Tupla (tipos de los valores por columna, tipos de los elementos de listas por columna)
+        """
+        value_types = {}
+        element_types = {}
+
+        for page in pages:
+            rows = flatten_records(page)
+            spool.write(b"".join(orjson.dumps(row) + b"\n" for row in rows))
+            _collect_types(rows, set().union(*rows), value_types, element_types)
+
+        return value_types, element_types
+
+    def _spooled_batches(self, pages: Iterable[List[Dict[str, Any]]]) -> Iterator[pa.RecordBatch]:
         """
-        Exporta data normalizada a archivo CSV
+        RecordBatches de una tabla sin proyección, pasando por un archivo temporal
+
+        Sin proyección no se conocen las columnas hasta ver toda la tabla: primero
+        se aplanan todas las páginas a un archivo temporal local, registrando la
+        unión de columnas y sus tipos, y luego se releen por bloques. La escritura
+        (y la carga a S3) empieza recién cuando termina el scan.
+
+        Args:
+            pages: Páginas de registros de DynamoDB
+
+        Yields:
+            Un RecordBatch por bloque de SPOOL_BATCH_ROWS registros
+        """
+        with tempfile.TemporaryFile() as spool:
+            value_types, element_types = self._spool_pages(pages, spool)
+            schema = _table_schema(_column_order(value_types), value_types, element_types)
+
+            spool.seek(0)
+            while True:
+                rows = [orjson.loads(line) for line in islice(spool, SPOOL_BATCH_ROWS)]
+                if not rows:
+                    break
+                yield self._rows_to_batch(rows, schema)
+
+    def _page_batches(self, pages: Iterable[List[Dict[str, Any]]],
+                      projection: Optional[List[str]] = None) -> Iterator[pa.RecordBatch]:
+        """
+        Convierte las páginas de registros en RecordBatches Arrow con un esquema común
+
+        Con proyección las columnas se conocen de antemano y los batches se
+        generan página a página (_projected_batches). Sin proyección las páginas
+        pasan antes por un archivo temporal para conocer todas las columnas
+        (_spooled_batches). En ambos casos cada columna tiene un tipo estable
+        (string con valores en JSON si los tipos se mezclan).
+
+        Args:
+            pages: Páginas de registros de DynamoDB
+            projection: Atributos proyectados, que fijan las columnas y su orden
+
+        Returns:
+            Iterador de RecordBatches
+        """
+        if projection:
+            return self._projected_batches(pages, projection)
+        return self._spooled_batches(pages)
+
+    def _write_csv(self, pages: Iterable[List[Dict[str, Any]]], f: BinaryIO,
+                   projection: Optional[List[str]] = None) -> int:
+        """
+        Escribe las páginas de registros en formato CSV con el writer C++ de PyArrow
+
+        Las columnas anidadas (listas, maps) se escriben como JSON. Si hay
+        csv_compression, el CSV se comprime al vuelo.
+
+        Args:
+            pages: Páginas de registros de DynamoDB
+            f: Archivo binario destino
+            projection: Atributos proyectados, que fijan las columnas y su orden
+
+        Returns:
+            Número de registros escritos
+        """
+        total_rows = 0
+        writer = None
+        sink = pa.CompressedOutputStream(f, self.csv_compression) if self.csv_compression else f
+        completed = False
+
+        try:
+            for batch in self._page_batches(pages, projection):
+                batch = _nested_to_json(batch)
+                if writer is None:
+                    writer = pv.CSVWriter(sink, batch.schema, write_options=pv.WriteOptions(batch_size=65536))
+                writer.write_batch(batch)
+                total_rows += batch.num_rows
+            completed = True
+        finally:
+            try:
+                if writer is not None:
+                    writer.close()
+                if sink is not f:
+                    if not completed and isinstance(f, S3MultipartWriter):
+                        # Cerrar el stream cierra también f: se aborta antes para no completar la carga
+                        f.abort()
+                    # Escribe el final del frame comprimido; también cierra el archivo destino
+                    sink.close()
+            except Exception:
+                # Si ya hubo un error, no se oculta detrás del error al cerrar
+                if completed:
+                    raise
+
+        return total_rows
+
+    def _write_parquet(self, pages: Iterable[List[Dict[str, Any]]], f: BinaryIO,
+                       projection: Optional[List[str]] = None) -> int:
+        """
+        Escribe las páginas de registros en formato Parquet (zstd)
+
+        Los batches se acumulan hasta ~PARQUET_ROW_GROUP_BYTES y se escriben
+        como un único row group, para no generar miles de row groups pequeños.
+
+        Args:
+            pages: Páginas de registros de DynamoDB
+            f: Archivo binario destino
+            projection: Atributos proyectados, que fijan las columnas y su orden
+
+        Returns:
+            Número de registros escritos
+        """
+        total_rows = 0
+        writer = None
+        buffered = []
+        buffered_bytes = 0
+
+        def flush() -> None:
+            table = pa.Table.from_batches(buffered)
+            writer.write_table(table, row_group_size=table.num_rows)
+            buffered.clear()
+
+        try:
+            for batch in self._page_batches(pages, projection):
+                if writer is None:
+                    writer = pq.ParquetWriter(f, batch.schema, compression='zstd', use_dictionary=True)
+                buffered.append(batch)
+                buffered_bytes += batch.nbytes
+                total_rows += batch.num_rows
+                if buffered_bytes >= PARQUET_ROW_GROUP_BYTES:
+                    flush()
+                    buffered_bytes = 0
+            if buffered:
+                flush()
+        finally:
+            if writer is not None:
+                writer.close()
+
+        return total_rows
+
+    def export_data(self, pages: Iterable[List[Dict[str, Any]]], table_name: str, folder: str,
+                    projection: Optional[List[str]] = None) -> Optional[Future]:
+        """
+        Exporta los registros a archivo Parquet o CSV, página por página
         
+        Con stream_to_s3 el archivo se sube a S3 por partes a medida que se
+        escribe; si no, se escribe en output_dir y se sube en segundo plano.
+
         Args:
-            df: Pandas DataFrame a exportar
+            pages: Páginas de registros de DynamoDB
             table_name: Nombre de la tabla
             folder: Carpeta destino en S3
+            projection: Atributos proyectados, que fijan las columnas y su orden
+
+        Returns:
+            Future de la carga a S3 en segundo plano, o None si ya se subió por streaming
         """
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"{table_name}_{timestamp}.csv"
-        local_path = os.path.join(self.output_dir, filename)
+        filename = f"{table_name}_{timestamp}.{self.file_extension}"
+        write = self._write_parquet if self.file_format == 'parquet' else self._write_csv
         
         try:
-            self.logger.info(f"Iniciando exportación de {len(df)} registros a CSV")
-            df.to_csv(local_path, index=False)
-            self.logger.info(f"Datos exportados localmente a {local_path}")
+            self.logger.info(f"Iniciando exportación de {table_name} a {self.file_extension}")
+
+            if self.stream_to_s3:
+                s3_key = f"{folder}/{filename}"
+                with S3MultipartWriter(self.s3, self.bucket_name, s3_key) as sink:
+                    total_rows = write(pages, sink, projection)
+                self.logger.info(f"{total_rows} registros exportados a s3://{self.bucket_name}/{s3_key}")
+                return None
+
+            local_path = os.path.join(self.output_dir, filename)
+            with open(local_path, 'wb') as f:
+                total_rows = write(pages, f, projection)
+            self.logger.info(f"{total_rows} registros exportados localmente a {local_path}")
             
-            self.upload_to_s3(local_path, filename, folder)
+            return self.upload_executor.submit(self.upload_to_s3, local_path, filename, folder)
 
         except Exception as e:
             self.logger.error(f"Error en exportación: {str(e)}")
@@ -164,26 +1061,37 @@ class DynamoDBExporter:
         """
         self.logger.info(f"Iniciando proceso de exportación para {len(self.table_names)} tablas")
         start_time = time.time()
+        uploads = []
+        # El transfer manager solo se usa para subir archivos locales
+        self.transfer = None if self.stream_to_s3 else self._create_crt_transfer_manager()
+        # Sube el archivo local de una tabla mientras se exporta la siguiente
+        self.upload_executor = ThreadPoolExecutor(max_workers=1)
         
         try:
             for table_name in self.table_names:
                 self.logger.info(f"=== Procesando tabla: {table_name} ===")
                 
                 # Scan table
-                items = self.scan_table(table_name)
-                if not items:
-                    self.logger.warning(f"No se encontraron registros en {table_name}")
-                    continue
+                projection = self.projections.get(table_name)
+                with closing(self.scan_table(table_name, projection=projection)) as scan:
+                    pages = (page for page in scan if page)
+                    first_page = next(pages, None)
+                    if first_page is None:
+                        self.logger.warning(f"No se encontraron registros en {table_name}")
+                        continue
                     
-                # Normalize data
-                df = self.normalize_data(items)
-                
-                # Export data
-                folder = table_name.split('_')[2]  # Obtiene 'users', 'songs', etc.
-                self.export_data(df, table_name, folder)
+                    # Export data
+                    folder = self.s3_prefix_fn(table_name)
+                    upload = self.export_data(chain([first_page], pages), table_name, folder, projection)
+                    if upload is not None:
+                        uploads.append(upload)
                 
                 self.logger.info(f"=== Procesamiento de {table_name} completado ===")
             
+            # Esperar las cargas a S3 que siguen en segundo plano
+            for upload in uploads:
+                upload.result()
+
             duration = time.time() - start_time
             self.logger.info(f"Proceso de exportación completado. Duración total: {duration:.2f} segundos")
             
@@ -191,9 +1099,24 @@ class DynamoDBExporter:
             self.logger.critical(f"Error fatal en el proceso: {str(e)}")
             raise
 
-if __name__ == "__main__":
+        finally:
+            self.upload_executor.shutdown(wait=True)
+            self.upload_executor = None
+            if self.transfer is not None:
+                self.transfer.shutdown()
+                self.transfer = None
+
+def main():
     TABLE_NAMES = ["dev-fp-t_users", "dev-fp-t_user_replays"]
+    # Columnas publicadas en los esquemas de Glue (schemas/)
+    PROJECTIONS = {
+        "dev-fp-t_users": ["city", "password", "created_at", "email", "country", "name", "user_name", "age"],
+        "dev-fp-t_user_replays": ["song_id", "replayed_at", "email", "song_title", "user_email", "replay_duration"],
+    }
     
     # Initialize and run exporter
-    exporter = DynamoDBExporter(table_names=TABLE_NAMES, container_name="ingesta_users")
+    exporter = DynamoDBExporter(table_names=TABLE_NAMES, container_name="ingesta_users", projections=PROJECTIONS)
     exporter.run()
+
+if __name__ == "__main__":
+    main()
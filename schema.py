@@ -1,42 +1,101 @@
-import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
 import json
 import os
+from concurrent.futures import ProcessPoolExecutor
 
-def generate_glue_schema(csv_path: str) -> list:
+# Extensions of the files produced by the exporter
+EXPORT_EXTENSIONS = ('.csv', '.csv.zst', '.csv.gz', '.parquet')
+
+def arrow_to_glue_type(arrow_type: pa.DataType) -> str:
+    """
+    Map an Arrow data type to its AWS Glue equivalent
+    
+    Args:
+        arrow_type: Arrow data type
+        
+    Returns:
+        Glue type name
     """
-    Generate AWS Glue compatible schema from CSV file
+    if pa.types.is_dictionary(arrow_type):
+        return arrow_to_glue_type(arrow_type.value_type)
+    if pa.types.is_boolean(arrow_type):
+        return 'boolean'
+    if pa.types.is_int64(arrow_type) or pa.types.is_uint32(arrow_type) or pa.types.is_uint64(arrow_type):
+        return 'bigint'
+    if pa.types.is_integer(arrow_type):
+        return 'int'
+    if pa.types.is_float32(arrow_type):
+        return 'float'
+    if pa.types.is_floating(arrow_type):
+        return 'double'
+    if pa.types.is_decimal(arrow_type):
+        return f"decimal({arrow_type.precision},{arrow_type.scale})"
+    if pa.types.is_timestamp(arrow_type):
+        return 'timestamp'
+    if pa.types.is_date(arrow_type):
+        return 'date'
+    if pa.types.is_list(arrow_type) or pa.types.is_large_list(arrow_type):
+        return f"array<{arrow_to_glue_type(arrow_type.value_type)}>"
+    if pa.types.is_struct(arrow_type):
+        fields = ','.join(f"{field.name}:{arrow_to_glue_type(field.type)}" for field in arrow_type)
+        return f"struct<{fields}>"
+    return 'string'
+
+def generate_parquet_glue_schema(parquet_path: str) -> list:
+    """
+    Generate AWS Glue compatible schema from a Parquet file footer
     
     Args:
-        csv_path: Path to the CSV file
+        parquet_path: Path to the Parquet file
         
     Returns:
         List of column definitions in Glue format
     """
-    # Read the CSV file
-    df = pd.read_csv(csv_path)
+    # Only the footer is read, no data is loaded
+    arrow_schema = pq.read_schema(parquet_path)
     
-    # Map pandas dtypes to Glue data types
-    dtype_mapping = {
-        'object': 'string',
-        'int64': 'int',
-        'float64': 'double',
-        'bool': 'boolean',
-        'datetime64[ns]': 'timestamp'
-    }
+    return [
+        {"Name": field.name, "Type": arrow_to_glue_type(field.type)}
+        for field in arrow_schema
+    ]
+
+def generate_csv_glue_schema(csv_path: str) -> list:
+    """
+    Generate AWS Glue compatible schema from the first block of a CSV file
     
-    # Generate schema
-    schema = []
-    for column in df.columns:
-        dtype = str(df[column].dtype)
-        glue_type = dtype_mapping.get(dtype, 'string')  # default to string if type unknown
+    Args:
+        csv_path: Path to the CSV file (.zst/.gz are decompressed on the fly)
         
-        column_def = {
-            "Name": column,
-            "Type": glue_type
-        }
-        schema.append(column_def)
+    Returns:
+        List of column definitions in Glue format
+    """
+    # The streaming reader infers the schema from the first block only
+    reader = pv.open_csv(csv_path)
+    try:
+        arrow_schema = reader.schema
+    finally:
+        reader.close()
+    
+    return [
+        {"Name": field.name, "Type": arrow_to_glue_type(field.type)}
+        for field in arrow_schema
+    ]
+
+def generate_glue_schema(file_path: str) -> list:
+    """
+    Generate AWS Glue compatible schema from CSV or Parquet file
     
-    return schema
+    Args:
+        file_path: Path to the CSV or Parquet file
+        
+    Returns:
+        List of column definitions in Glue format
+    """
+    if file_path.endswith('.parquet'):
+        return generate_parquet_glue_schema(file_path)
+    return generate_csv_glue_schema(file_path)
 
 def save_schema(schema: list, output_path: str):
     """
@@ -51,25 +110,35 @@ def save_schema(schema: list, output_path: str):
     print(f"Schema saved to: {output_path}")
 
 def main():
-    # Get all CSV files in the data directory
+    # Get all exported files in the data directory
     data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
     schema_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schemas')
     
     # Create schemas directory if it doesn't exist
     os.makedirs(schema_dir, exist_ok=True)
     
-    # Process each CSV file
-    for filename in os.listdir(data_dir):
-        if filename.endswith('.csv'):
-            csv_path = os.path.join(data_dir, filename)
+    # Collect the exported files
+    exported_files = []
+    for filename in sorted(os.listdir(data_dir)):
+        extension = next((ext for ext in EXPORT_EXTENSIONS if filename.endswith(ext)), None)
+        if extension:
+            exported_files.append((filename, extension))
+    
+    # Generate schemas in parallel across CPU cores
+    with ProcessPoolExecutor() as executor:
+        futures = [
+            executor.submit(generate_glue_schema, os.path.join(data_dir, filename))
+            for filename, _ in exported_files
+        ]
+        
+        for (filename, extension), future in zip(exported_files, futures):
             print(f"\nProcessing: {filename}")
             
             try:
-                # Generate schema
-                schema = generate_glue_schema(csv_path)
+                schema = future.result()
                 
                 # Save schema to JSON file
-                schema_filename = f"{os.path.splitext(filename)[0]}_schema.json"
+                schema_filename = f"{filename[:-len(extension)]}_schema.json"
                 schema_path = os.path.join(schema_dir, schema_filename)
                 save_schema(schema, schema_path)
                 
@@ -0,0 +1,55 @@
+"""
+Pruebas del aplanador de Python (ingesta._flatten_records) y de su equivalencia
+con el compilado (_flatten.pyx)
+
+Las pruebas del compilado se omiten si no se compiló la extensión: cythonize -i _flatten.pyx
+"""
+import pytest
+
+import ingesta
+
+RECORDS = [
+    {"email": "a@b.c", "age": 30, "address": {"city": "Lima", "geo": {"lat": 1.5, "lng": -2.0}}},
+    {"email": "d@e.f", "tags": ["x", "y"], "address": {}, "active": True, "score": None},
+    {"plays": [{"song_id": 1}], "meta": {"empty": {}, "nested": {"deep": {"deeper": "z"}}}},
+    {"ids": {str(i): i for i in range(ingesta._FLAT_KEYS_MAX_PER_PREFIX + 10)}},
+    {},
+]
+
+
+def test_flatten_records_python():
+    result = ingesta._flatten_records(RECORDS[:3] + [{"a": {"b": 1}, "c": 2}, {}])
+
+    assert result == [
+        {"email": "a@b.c", "age": 30, "address.city": "Lima", "address.geo.lat": 1.5, "address.geo.lng": -2.0},
+        {"email": "d@e.f", "tags": ["x", "y"], "active": True, "score": None},
+        {"plays": [{"song_id": 1}], "meta.nested.deep.deeper": "z"},
+        {"a.b": 1, "c": 2},
+        {},
+    ]
+    # Las claves conservan el orden del registro
+    assert list(result[0]) == ["email", "age", "address.city", "address.geo.lat", "address.geo.lng"]
+
+
+def test_flatten_python_beyond_cache_bounds():
+    ids = {str(i): i for i in range(ingesta._FLAT_KEYS_MAX_PER_PREFIX + 10)}
+
+    result = ingesta._flatten_records([{"ids": ids}])
+
+    assert result == [{f"ids.{k}": v for k, v in ids.items()}]
+
+
+def test_flatten_records_matches_python():
+    _flatten = pytest.importorskip("_flatten")
+    expected = ingesta._flatten_records(RECORDS)
+    result = _flatten.flatten_records(RECORDS)
+
+    assert result == expected
+    # Mismo orden de columnas
+    assert [list(row) for row in result] == [list(row) for row in expected]
+
+
+def test_flatten_records_rejects_non_dict():
+    _flatten = pytest.importorskip("_flatten")
+    with pytest.raises(TypeError):
+        _flatten.flatten_records([["not", "a", "dict"]])
@@ -0,0 +1,122 @@
+"""
+Pruebas de ingesta.S3MultipartWriter con un cliente S3 falso
+"""
+import threading
+import time
+from concurrent.futures import wait
+
+import pyarrow as pa
+import pytest
+
+from ingesta import S3MultipartWriter
+
+
+class FakeS3:
+    """
+    Cliente S3 mínimo que registra las llamadas del multipart upload
+    """
+
+    def __init__(self, fail_part=None, delays=None):
+        self.fail_part = fail_part
+        self.delays = delays or {}
+        self.parts = {}
+        self.completed = []
+        self.aborted = []
+        self._lock = threading.Lock()
+
+    def create_multipart_upload(self, Bucket, Key):
+        return {'UploadId': 'upload-1'}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        time.sleep(self.delays.get(PartNumber, 0))
+        if PartNumber == self.fail_part:
+            raise IOError(f"fallo en la parte {PartNumber}")
+        with self._lock:
+            self.parts[PartNumber] = Body
+        return {'ETag': f'etag-{PartNumber}'}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        self.completed.append(MultipartUpload['Parts'])
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.aborted.append(UploadId)
+
+
+def test_parts_are_numbered_and_completed_in_order():
+    # Las primeras partes tardan más, así terminan fuera de orden
+    s3 = FakeS3(delays={1: 0.05, 2: 0.02})
+    data = bytes(range(256)) * 4
+
+    with S3MultipartWriter(s3, 'bucket', 'key', part_size=100, max_workers=3) as writer:
+        for i in range(0, len(data), 30):
+            writer.write(data[i:i + 30])
+        assert writer.tell() == len(data)
+
+    assert len(s3.completed) == 1
+    parts = s3.completed[0]
+    assert [p['PartNumber'] for p in parts] == list(range(1, len(parts) + 1))
+    assert [p['ETag'] for p in parts] == [f"etag-{p['PartNumber']}" for p in parts]
+    assert b"".join(s3.parts[p['PartNumber']] for p in parts) == data
+    assert not s3.aborted
+
+
+def test_empty_upload_sends_one_part():
+    s3 = FakeS3()
+
+    with S3MultipartWriter(s3, 'bucket', 'key', part_size=100):
+        pass
+
+    assert s3.completed == [[{'PartNumber': 1, 'ETag': 'etag-1'}]]
+
+
+def test_failed_part_aborts_upload():
+    s3 = FakeS3(fail_part=2)
+
+    with pytest.raises(IOError):
+        with S3MultipartWriter(s3, 'bucket', 'key', part_size=10, max_workers=2) as writer:
+            for _ in range(3):
+                writer.write(b"x" * 10)
+
+    assert s3.aborted == ['upload-1']
+    assert not s3.completed
+
+
+def test_failed_part_is_raised_on_next_flush():
+    s3 = FakeS3(fail_part=1)
+    writer = S3MultipartWriter(s3, 'bucket', 'key', part_size=10, max_workers=2)
+    writer.write(b"x" * 10)
+    wait(writer._parts)
+
+    with pytest.raises(IOError):
+        writer.write(b"y" * 10)
+
+    writer.abort()
+    assert s3.aborted == ['upload-1']
+
+
+def test_close_twice_is_a_noop():
+    s3 = FakeS3()
+    writer = S3MultipartWriter(s3, 'bucket', 'key', part_size=10)
+    writer.write(b"abc")
+
+    writer.close()
+    writer.close()
+    writer.abort()
+
+    assert writer.closed
+    assert len(s3.completed) == 1
+    assert not s3.aborted
+
+
+def test_compressed_stream_closing_its_sink_completes_once():
+    s3 = FakeS3()
+
+    with S3MultipartWriter(s3, 'bucket', 'key', part_size=10) as writer:
+        stream = pa.CompressedOutputStream(writer, 'zstd')
+        stream.write(b"a,b\n1,2\n" * 10)
+        # Cierra también el writer; el __exit__ no debe completar de nuevo
+        stream.close()
+
+    assert len(s3.completed) == 1
+    body = b"".join(s3.parts[p['PartNumber']] for p in s3.completed[0])
+    assert pa.CompressedInputStream(pa.BufferReader(body), 'zstd').read() == b"a,b\n1,2\n" * 10